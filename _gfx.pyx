@@ -0,0 +1,23 @@
+"""Compiled RGBA expansion of the CHIP-8 display, built by setup.py"""
+from libc.stdint cimport uint32_t, uint64_t
+
+
+def expand(const uint64_t[::1] gfx, uint32_t[:, :] out):
+    """Unpack one uint64 per row (MSB = leftmost pixel) into RGBA8888 pixels in out
+
+    The row width is fixed at 64 pixels so the compiler can unroll and vectorize the
+    branchless inner loop. out may be a strided view such as the pitch-padded texture memory.
+    """
+    cdef Py_ssize_t rows = gfx.shape[0]
+    cdef Py_ssize_t row, col
+    cdef uint64_t bits
+
+    if out.shape[0] < rows or out.shape[1] < 64:
+        raise ValueError("out must hold at least len(gfx) rows of 64 pixels")
+
+    with nogil:
+        for row in range(rows):
+            bits = gfx[row]
+            for col in range(64):
+                # 0/1 bit scaled into the RGB bytes, alpha always opaque
+                out[row, col] = <uint32_t>((bits >> (63 - col)) & 1) * 0xFFFFFF00u | 0x000000FFu
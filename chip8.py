@@ -1,18 +1,21 @@
 ﻿import time
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
+
+import numpy as np
 
 @dataclass
 class Chip8:
-    memory: List[int] = field(default_factory=lambda: [0] * 4096)    # 4K memory
-    v: List[int] = field(default_factory=lambda: [0] * 16)           # registers V0 to VF
-    gfx: List[int] = field(default_factory=lambda: [0] * (64 * 32))  # graphics (64x32 pixels)
-    stack: List[int] = field(default_factory=lambda: [0] * 16)       # call stack
-    sp: int = 0                                                      # stack pointer
-    pc: int = 0                                                      # program counter
-    i: int = 0                                                       # index
-    delay_timer: int = 0                                             # delay
-    sound_timer: int = 0                                             # sound
-    keyboard: int = 0                                                # hex keyboard state
-    waiting_for_key_press: bool = False                              # true if waiting for a key press to store in Vx
-    watch_start: float = field(default_factory=time.time)            # timer for 60Hz updates
+    memory: np.ndarray = field(default_factory=lambda: np.zeros(4096, dtype=np.uint8))    # 4K memory
+    v: np.ndarray = field(default_factory=lambda: np.zeros(16, dtype=np.uint8))           # registers V0 to VF
+    gfx: np.ndarray = field(default_factory=lambda: np.zeros(32, dtype=np.uint64))        # graphics (64x32 pixels, one 64-bit row per line, MSB = x 0)
+    stack: np.ndarray = field(default_factory=lambda: np.zeros(16, dtype=np.uint16))      # call stack
+    sp: int = 0                                                                           # stack pointer
+    pc: int = 0                                                                           # program counter
+    i: int = 0                                                                            # index
+    delay_timer: int = 0                                                                  # delay
+    sound_timer: int = 0                                                                  # sound
+    keyboard: int = 0                                                                     # hex keyboard state
+    waiting_for_key_press: bool = False                                                   # true if waiting for a key press to store in Vx
+    decoded: List[Optional[tuple]] = field(default_factory=lambda: [None] * 4096)         # decoded instruction cache by address (None = not decoded)
+    rng_state: int = field(default_factory=lambda: (time.time_ns() & 0xFFFFFFFF) | 1)     # xorshift32 state for random numbers, never 0
@@ -1,5 +1,18 @@
 ﻿from enum import Flag
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional, kernels then run as plain Python
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
 class StateError(Flag):
     NONE = 0
     SDL_INIT = 1
@@ -8,8 +21,3 @@ class StateError(Flag):
     FILE_LOAD = 8
     AUDIO_INIT = 16
 
-
-class StateErrorExtensions:
-    @staticmethod
-    def has_flag_fast(value: StateError, flag: StateError) -> bool:
-        return (value & flag) != StateError.NONE
@@ -1,8 +1,9 @@
-﻿import random
-import time
-from typing import List
+﻿from typing import List
+
+import numpy as np
 
 from chip8 import Chip8
+from sprites import draw_sprite
 
 
 class Chip8Exception(Exception):
@@ -10,18 +11,289 @@ class Chip8Exception(Exception):
     pass
 
 
+# Opcode handlers. Each receives the machine state, the full opcode and its fields
+# (x, y, n, nn, nnn) extracted once at decode, with chip8.pc already advanced past
+# the instruction.
+
+def _op_unsupported(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
+
+
+def _op_0nnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Clear screen and return from subroutine"""
+    if opcode == 0x00E0:  # clear screen
+        chip8.gfx.fill(0)
+    elif opcode == 0x00EE:  # return from subroutine
+        chip8.sp -= 1
+        chip8.pc = int(chip8.stack[chip8.sp])
+    else:
+        raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
+
+
+def _op_1nnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Jump to address NNN"""
+    chip8.pc = nnn
+
+
+def _op_2nnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Call subroutine at NNN"""
+    chip8.stack[chip8.sp] = chip8.pc
+    chip8.sp += 1
+    chip8.pc = nnn
+
+
+def _op_3xnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Skip next instruction if Vx == NN"""
+    if chip8.v[x] == nn:
+        chip8.pc += 2
+
+
+def _op_4xnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Skip next instruction if Vx != NN"""
+    if chip8.v[x] != nn:
+        chip8.pc += 2
+
+
+def _op_5xy0(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Skip next instruction if Vx == Vy"""
+    v = chip8.v
+    if v[x] == v[y]:
+        chip8.pc += 2
+
+
+def _op_6xnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set Vx = NN"""
+    chip8.v[x] = nn
+
+
+def _op_7xnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set Vx = Vx + NN"""
+    v = chip8.v
+    v[x] = (int(v[x]) + nn) & 0xFF
+
+
+def _op_8xy0(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """LD Vx, Vy"""
+    v = chip8.v
+    v[x] = v[y]
+
+
+def _op_8xy1(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """OR Vx, Vy"""
+    v = chip8.v
+    v[x] |= v[y]
+
+
+def _op_8xy2(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """AND Vx, Vy"""
+    v = chip8.v
+    v[x] &= v[y]
+
+
+def _op_8xy3(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """XOR Vx, Vy"""
+    v = chip8.v
+    v[x] ^= v[y]
+
+
+def _op_8xy4(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """ADD Vx, Vy"""
+    v = chip8.v
+    result = int(v[x]) + int(v[y])
+    v[15] = 1 if result > 255 else 0  # VF = carry flag
+    v[x] = result & 0xFF
+
+
+def _op_8xy5(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """SUB Vx, Vy"""
+    v = chip8.v
+    v[15] = 1 if v[x] > v[y] else 0  # VF = borrow flag
+    v[x] = (int(v[x]) - int(v[y])) & 0xFF
+
+
+def _op_8xy6(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """SHR Vx {, Vy}"""
+    v = chip8.v
+    v[15] = v[x] & 0x01
+    v[x] = v[x] >> 1
+
+
+def _op_8xy7(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """SUBN Vx, Vy"""
+    v = chip8.v
+    v[15] = 1 if v[y] > v[x] else 0
+    v[x] = (int(v[y]) - int(v[x])) & 0xFF
+
+
+def _op_8xye(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """SHL Vx {, Vy}"""
+    v = chip8.v
+    v[15] = 1 if (v[x] & 0x80) == 0x80 else 0
+    v[x] = (int(v[x]) << 1) & 0xFF
+
+
+def _op_9xy0(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Skip next instruction if Vx != Vy"""
+    v = chip8.v
+    if v[x] != v[y]:
+        chip8.pc += 2
+
+
+def _op_annn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set I = NNN"""
+    chip8.i = nnn
+
+
+def _op_bnnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Jump to address NNN + V0"""
+    chip8.pc = nnn + int(chip8.v[0])
+
+
+def _op_cxnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set Vx = random byte AND NN"""
+    # xorshift32, plenty for games and far cheaper than a Mersenne Twister draw
+    state = chip8.rng_state
+    state ^= (state << 13) & 0xFFFFFFFF
+    state ^= state >> 17
+    state ^= (state << 5) & 0xFFFFFFFF
+    chip8.rng_state = state
+    chip8.v[x] = state & nn
+
+
+def _op_dxyn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Display n-byte sprite starting at memory location I at (Vx, Vy)"""
+    v = chip8.v
+    collision = draw_sprite(chip8.gfx, chip8.memory, chip8.i, int(v[x]), int(v[y]), n)
+    v[15] = 1 if collision else 0
+
+
+def _op_exnn(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Key operations"""
+    if nn == 0x009E:  # skip next instruction if key with value of Vx is pressed
+        key_val = int(chip8.v[x])
+        if ((chip8.keyboard >> key_val) & 0x01) == 0x01:
+            chip8.pc += 2
+    elif nn == 0x00A1:  # skip next instruction if key with value of Vx is not pressed
+        key_val = int(chip8.v[x])
+        if ((chip8.keyboard >> key_val) & 0x01) != 0x01:
+            chip8.pc += 2
+    else:
+        raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
+
+
+def _op_fx07(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set Vx = delay timer value"""
+    chip8.v[x] = chip8.delay_timer
+
+
+def _op_fx0a(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Wait for key press, store value in Vx"""
+    chip8.waiting_for_key_press = True
+    chip8.pc -= 2
+
+
+def _op_fx15(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set delay timer = Vx"""
+    chip8.delay_timer = int(chip8.v[x])
+
+
+def _op_fx18(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set sound timer = Vx"""
+    chip8.sound_timer = int(chip8.v[x])
+
+
+def _op_fx1e(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set I = I + Vx"""
+    chip8.i = (chip8.i + int(chip8.v[x])) & 0xFFFF
+
+
+def _op_fx29(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Set I = location of sprite for digit Vx"""
+    chip8.i = int(chip8.v[x]) * 5
+
+
+def _op_fx33(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Store BCD representation of Vx"""
+    memory = chip8.memory
+    i = chip8.i
+    value = chip8.v[x]
+    memory[i] = value // 100
+    memory[i + 1] = (value % 100) // 10
+    memory[i + 2] = value % 10
+    _invalidate_decoded(chip8, i, 3)
+
+
+def _op_fx55(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Store registers V0 through Vx in memory starting at I"""
+    i = chip8.i
+    chip8.memory[i:i + x + 1] = chip8.v[:x + 1]
+    _invalidate_decoded(chip8, i, x + 1)
+
+
+def _op_fx65(chip8: Chip8, opcode: int, x: int, y: int, n: int, nn: int, nnn: int) -> None:
+    """Read registers V0 through Vx from memory starting at I"""
+    i = chip8.i
+    chip8.v[:x + 1] = chip8.memory[i:i + x + 1]
+
+
+# Dispatch tables, indexed by the high nibble (main), the low nibble (8xyN)
+# and the low byte (FxNN). Gaps raise Chip8Exception. _decode resolves 8xyN
+# and FxNN straight from their sub-tables, so their main slots stay None.
+_OPCODE_TABLE = (
+    _op_0nnn, _op_1nnn, _op_2nnn, _op_3xnn, _op_4xnn, _op_5xy0, _op_6xnn, _op_7xnn,
+    None, _op_9xy0, _op_annn, _op_bnnn, _op_cxnn, _op_dxyn, _op_exnn, None,
+)
+
+_ARITHMETIC_TABLE = (
+    _op_8xy0, _op_8xy1, _op_8xy2, _op_8xy3, _op_8xy4, _op_8xy5, _op_8xy6, _op_8xy7,
+    _op_unsupported, _op_unsupported, _op_unsupported, _op_unsupported,
+    _op_unsupported, _op_unsupported, _op_8xye, _op_unsupported,
+)
+
+_MISC_TABLE = [_op_unsupported] * 256
+_MISC_TABLE[0x07] = _op_fx07
+_MISC_TABLE[0x0A] = _op_fx0a
+_MISC_TABLE[0x15] = _op_fx15
+_MISC_TABLE[0x18] = _op_fx18
+_MISC_TABLE[0x1E] = _op_fx1e
+_MISC_TABLE[0x29] = _op_fx29
+_MISC_TABLE[0x33] = _op_fx33
+_MISC_TABLE[0x55] = _op_fx55
+_MISC_TABLE[0x65] = _op_fx65
+_MISC_TABLE = tuple(_MISC_TABLE)
+
+
+def _decode(opcode: int) -> tuple:
+    """Resolve an opcode to its final handler (sub-tables included) and its fields"""
+    kind = opcode >> 12
+    n = opcode & 0xF
+    nn = opcode & 0xFF
+
+    if kind == 0x8:
+        handler = _ARITHMETIC_TABLE[n]
+    elif kind == 0xF:
+        handler = _MISC_TABLE[nn]
+    else:
+        handler = _OPCODE_TABLE[kind]
+
+    return handler, opcode, (opcode >> 8) & 0xF, (opcode >> 4) & 0xF, n, nn, opcode & 0xFFF
+
+
+def _invalidate_decoded(chip8: Chip8, address: int, length: int) -> None:
+    """Drop cached decodes overlapping memory[address:address + length] after a write"""
+    start = max(address - 1, 0)  # an instruction at address - 1 reads the byte at address
+    end = address + length
+    chip8.decoded[start:end] = [None] * (end - start)
+
+
 class Cpu:
-    # Font character data (equivalent to ReadOnlySpan<byte> in C#)
-    FONT_CHARACTERS = [
+    # Font character data (equivalent to ReadOnlySpan<byte> in C#), packed once so loading is a single copy
+    FONT_CHARACTERS = np.frombuffer(bytes([
         0xF0, 0x90, 0x90, 0x90, 0xF0, 0x20, 0x60, 0x20, 0x20, 0x70, 0xF0, 0x10, 0xF0, 0x80, 0xF0, 0xF0, 0x10, 0xF0, 0x10, 0xF0,
         0x90, 0x90, 0xF0, 0x10, 0x10, 0xF0, 0x80, 0xF0, 0x10, 0xF0, 0xF0, 0x80, 0xF0, 0x90, 0xF0, 0xF0, 0x10, 0x20, 0x40, 0x40,
         0xF0, 0x90, 0xF0, 0x90, 0xF0, 0xF0, 0x90, 0xF0, 0x10, 0xF0, 0xF0, 0x90, 0xF0, 0x90, 0x90, 0xE0, 0x90, 0xE0, 0x90, 0xE0,
         0xF0, 0x80, 0x80, 0x80, 0xF0, 0xE0, 0x90, 0x90, 0x90, 0xE0, 0xF0, 0x80, 0xF0, 0x80, 0xF0, 0xF0, 0x80, 0xF0, 0x80, 0x80
-    ]
-
-    def __init__(self):
-        self.generator = random.Random()
-        self.generator.seed()
+    ]), dtype=np.uint8)
 
     @staticmethod
     def load_program(chip8: Chip8, program: List[int]) -> None:
@@ -29,7 +301,7 @@ class Cpu:
         program_start = 512
 
         # Clear memory and load font characters
-        chip8.memory[:] = [0] * 4096
+        chip8.memory.fill(0)
         chip8.memory[:len(Cpu.FONT_CHARACTERS)] = Cpu.FONT_CHARACTERS
 
         # Load program into memory starting at program_start
@@ -37,6 +309,11 @@ class Cpu:
             if program_start + i < len(chip8.memory):
                 chip8.memory[program_start + i] = byte_val & 0xFF
 
+        # Pre-decode the program, anything else (odd addresses, data) is decoded on first execution
+        chip8.decoded[:] = [None] * len(chip8.decoded)
+        for address in range(program_start, len(chip8.memory) - 1, 2):
+            chip8.decoded[address] = _decode((int(chip8.memory[address]) << 8) | int(chip8.memory[address + 1]))
+
         chip8.pc = program_start
         chip8.sp = 0
 
@@ -45,164 +322,55 @@ class Cpu:
         """Handle key press event"""
         chip8.waiting_for_key_press = False
 
-        opcode = (chip8.memory[chip8.pc] << 8) | chip8.memory[chip8.pc + 1]
+        opcode = (int(chip8.memory[chip8.pc]) << 8) | int(chip8.memory[chip8.pc + 1])
         chip8.v[(opcode & 0x0F00) >> 8] = key & 0xFF
         chip8.pc += 2
 
     @staticmethod
-    def step(chip8: Chip8, ticks_per_60hz: int) -> None:
-        """Execute one CPU step"""
-        current_time = time.time()
-        if chip8.watch_start == 0:
-            chip8.watch_start = current_time
-
-        # Update delay timer at 60Hz
-        if chip8.delay_timer > 0 and (current_time - chip8.watch_start) * 60 >= 1:
+    def tick_timers(chip8: Chip8) -> None:
+        """Count the delay and sound timers down by one, called at 60Hz"""
+        if chip8.delay_timer > 0:
             chip8.delay_timer -= 1
-            chip8.watch_start = current_time
-
-        opcode = (chip8.memory[chip8.pc] << 8) | chip8.memory[chip8.pc + 1]
+        if chip8.sound_timer > 0:
+            chip8.sound_timer -= 1
 
+    @staticmethod
+    def step(chip8: Chip8) -> None:
+        """Execute one CPU step"""
         if chip8.waiting_for_key_press:
             raise Chip8Exception("Do not call Step when chip8.waiting_for_key_press is set.")
 
-        nibble = opcode & 0xF000
-        nn = opcode & 0x00FF
+        pc = chip8.pc
+        decoded = chip8.decoded
+        entry = decoded[pc]
+        if entry is None:
+            memory = chip8.memory
+            entry = decoded[pc] = _decode((int(memory[pc]) << 8) | int(memory[pc + 1]))
 
-        chip8.pc += 2
+        chip8.pc = pc + 2
+
+        handler, opcode, x, y, n, nn, nnn = entry
+        handler(chip8, opcode, x, y, n, nn, nnn)
+
+    @staticmethod
+    def run_cycles(chip8: Chip8, cycles: int) -> None:
+        """Execute up to `cycles` CPU steps, stopping early when waiting for a key press"""
+        memory = chip8.memory
+        decoded = chip8.decoded
 
-        if nibble == 0x0000:
-            if opcode == 0x00E0:  # clear screen
-                chip8.gfx[:] = [0] * (64 * 32)
-            elif opcode == 0x00EE:  # return from subroutine
-                chip8.sp -= 1
-                chip8.pc = chip8.stack[chip8.sp]
-            else:
-                raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
-
-        elif nibble == 0x1000:  # jump to address NNN
-            chip8.pc = opcode & 0x0FFF
-
-        elif nibble == 0x2000:  # call subroutine at NNN
-            chip8.stack[chip8.sp] = chip8.pc
-            chip8.sp += 1
-            chip8.pc = opcode & 0x0FFF
-
-        elif nibble == 0x3000:  # skip next instruction if Vx == NN
-            if chip8.v[(opcode & 0x0F00) >> 8] == nn:
-                chip8.pc += 2
-
-        elif nibble == 0x4000:  # skip next instruction if Vx != NN
-            if chip8.v[(opcode & 0x0F00) >> 8] != nn:
-                chip8.pc += 2
-
-        elif nibble == 0x5000:  # skip next instruction if Vx == Vy
-            if chip8.v[(opcode & 0x0F00) >> 8] == chip8.v[(opcode & 0x00F0) >> 4]:
-                chip8.pc += 2
-
-        elif nibble == 0x6000:  # set Vx = NN
-            chip8.v[(opcode & 0x0F00) >> 8] = nn & 0xFF
-
-        elif nibble == 0x7000:  # set Vx = Vx + NN
-            vx_index = (opcode & 0x0F00) >> 8
-            chip8.v[vx_index] = (chip8.v[vx_index] + nn) & 0xFF
-
-        elif nibble == 0x8000:  # arithmetic operations
-            vx = (opcode & 0x0F00) >> 8
-            vy = (opcode & 0x00F0) >> 4
-            sub_op = opcode & 0x000F
-
-            if sub_op == 0:  # LD Vx, Vy
-                chip8.v[vx] = chip8.v[vy]
-            elif sub_op == 1:  # OR Vx, Vy
-                chip8.v[vx] = (chip8.v[vx] | chip8.v[vy]) & 0xFF
-            elif sub_op == 2:  # AND Vx, Vy
-                chip8.v[vx] = (chip8.v[vx] & chip8.v[vy]) & 0xFF
-            elif sub_op == 3:  # XOR Vx, Vy
-                chip8.v[vx] = (chip8.v[vx] ^ chip8.v[vy]) & 0xFF
-            elif sub_op == 4:  # ADD Vx, Vy
-                result = chip8.v[vx] + chip8.v[vy]
-                chip8.v[15] = 1 if result > 255 else 0  # VF = carry flag
-                chip8.v[vx] = result & 0xFF
-            elif sub_op == 5:  # SUB Vx, Vy
-                chip8.v[15] = 1 if chip8.v[vx] > chip8.v[vy] else 0  # VF = borrow flag
-                chip8.v[vx] = (chip8.v[vx] - chip8.v[vy]) & 0xFF
-            elif sub_op == 6:  # SHR Vx {, Vy}
-                chip8.v[15] = chip8.v[vx] & 0x01
-                chip8.v[vx] = chip8.v[vx] >> 1
-            elif sub_op == 7:  # SUBN Vx, Vy
-                chip8.v[15] = 1 if chip8.v[vy] > chip8.v[vx] else 0
-                chip8.v[vx] = (chip8.v[vy] - chip8.v[vx]) & 0xFF
-            elif sub_op == 14:  # SHL Vx {, Vy}
-                chip8.v[15] = 1 if (chip8.v[vx] & 0x80) == 0x80 else 0
-                chip8.v[vx] = (chip8.v[vx] << 1) & 0xFF
-            else:
-                raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
-
-        elif nibble == 0x9000:  # skip next instruction if Vx != Vy
-            if chip8.v[(opcode & 0x0F00) >> 8] != chip8.v[(opcode & 0x00F0) >> 4]:
-                chip8.pc += 2
-
-        elif nibble == 0xA000:  # set I = NNN
-            chip8.i = opcode & 0x0FFF
-
-        elif nibble == 0xB000:  # jump to address NNN + V0
-            chip8.pc = (opcode & 0x0FFF) + chip8.v[0]
-
-        elif nibble == 0xC000:  # set Vx = random byte AND NN
-            rnd_byte = random.randint(0, 255)
-            chip8.v[(opcode & 0x0F00) >> 8] = (rnd_byte & nn) & 0xFF
-
-        elif nibble == 0xD000:  # display n-byte sprite starting at memory location I at (Vx, Vy)
-            x = chip8.v[(opcode & 0x0F00) >> 8]
-            y = chip8.v[(opcode & 0x00F0) >> 4]
-            n = opcode & 0x000F
-            chip8.v[15] = 1 if Cpu.draw_sprites_fast(chip8, x, y, n) else 0
-
-        elif nibble == 0xE000:  # key operations
-            if nn == 0x009E:  # skip next instruction if key with value of Vx is pressed
-                key_val = chip8.v[(opcode & 0x0F00) >> 8]
-                if ((chip8.keyboard >> key_val) & 0x01) == 0x01:
-                    chip8.pc += 2
-            elif nn == 0x00A1:  # skip next instruction if key with value of Vx is not pressed
-                key_val = chip8.v[(opcode & 0x0F00) >> 8]
-                if ((chip8.keyboard >> key_val) & 0x01) != 0x01:
-                    chip8.pc += 2
-            else:
-                raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
-
-        elif nibble == 0xF000:  # miscellaneous operations
-            tx = (opcode & 0x0F00) >> 8
-            sub_op = opcode & 0x00FF
-
-            if sub_op == 0x07:  # set Vx = delay timer value
-                chip8.v[tx] = chip8.delay_timer
-            elif sub_op == 0x0A:  # wait for key press, store value in Vx
-                chip8.waiting_for_key_press = True
-                chip8.pc -= 2
-            elif sub_op == 0x15:  # set delay timer = Vx
-                chip8.delay_timer = chip8.v[tx]
-            elif sub_op == 0x18:  # set sound timer = Vx
-                chip8.sound_timer = chip8.v[tx]
-            elif sub_op == 0x1E:  # set I = I + Vx
-                chip8.i = (chip8.i + chip8.v[tx]) & 0xFFFF
-            elif sub_op == 0x29:  # set I = location of sprite for digit Vx
-                chip8.i = (chip8.v[tx] * 5) & 0xFFFF
-            elif sub_op == 0x33:  # store BCD representation of Vx
-                chip8.memory[chip8.i] = chip8.v[tx] // 100
-                chip8.memory[chip8.i + 1] = (chip8.v[tx] % 100) // 10
-                chip8.memory[chip8.i + 2] = chip8.v[tx] % 10
-            elif sub_op == 0x55:  # store registers V0 through Vx in memory starting at I
-                for i in range(tx + 1):
-                    chip8.memory[chip8.i + i] = chip8.v[i]
-            elif sub_op == 0x65:  # read registers V0 through Vx from memory starting at I
-                for i in range(tx + 1):
-                    chip8.v[i] = chip8.memory[chip8.i + i]
-            else:
-                raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
-
-        else:
-            raise Chip8Exception(f"Unsupported opcode {opcode:04X}")
+        for _ in range(cycles):
+            if chip8.waiting_for_key_press:
+                break
+
+            pc = chip8.pc
+            entry = decoded[pc]
+            if entry is None:
+                entry = decoded[pc] = _decode((int(memory[pc]) << 8) | int(memory[pc + 1]))
+
+            chip8.pc = pc + 2
+
+            handler, opcode, x, y, n, nn, nnn = entry
+            handler(chip8, opcode, x, y, n, nn, nnn)
 
     @staticmethod
     def draw_sprites_naive(chip8: Chip8, x: int, y: int, n: int) -> bool:
@@ -224,12 +392,12 @@ class Cpu:
                 if (sprite_byte & (0x80 >> col)) != 0:
                     pixel_x = (x + col) % 64
                     pixel_y = (y + row) % 32
-                    pixel_index = pixel_y * 64 + pixel_x
+                    pixel_bit = 1 << (63 - pixel_x)
 
-                    if chip8.gfx[pixel_index] == 1:
+                    if chip8.gfx[pixel_y] & pixel_bit:
                         collision = True
 
-                    chip8.gfx[pixel_index] ^= 1
+                    chip8.gfx[pixel_y] ^= pixel_bit
 
         return collision
 
@@ -238,10 +406,9 @@ class Cpu:
         """Optimized internal sprite drawing method (equivalent to C# DrawSpritesInternal)
 
         PERFORMANCE ANALYSIS:
-        - Better than draw_sprites: eliminates modulo operations and redundant bounds checks
+        - Better than draw_sprites: replaces modulo with power-of-two AND masks for wrapping
         - Still suffers from Python loop overhead and individual pixel manipulation
-        - Early break optimizations for out-of-bounds cases
-        - Uses 0xffffffff XOR which is overkill for boolean values
+        - No bounds branches: rows and columns wrap around the screen edges
         - Estimated: ~O(n*8) with medium constant factor, 2-3x faster than draw_sprites
         """
         set_last_v = False
@@ -249,91 +416,17 @@ class Cpu:
         memory = chip8.memory
 
         for byte_index in range(n):
-            current_y = y + byte_index
-            if current_y >= 32:
-                break
-
+            current_y = (y + byte_index) & 31
             mem = memory[chip8.i + byte_index]
-            row_offset = current_y * 64
-
-            current_x = x
-            for bit in range(7, -1, -1):  # bit = 7 down to 0
-                if current_x >= 64:
-                    break
-
-                index = row_offset + current_x
-                pixel = (mem >> bit) & 1
 
+            for col in range(8):
+                pixel = (mem >> (7 - col)) & 1
                 if pixel == 0:
-                    current_x += 1
                     continue
 
-                set_last_v |= gfx[index] > 0
-                gfx[index] ^= 0xffffffff
-                current_x += 1
-
-        return set_last_v
-
-    @staticmethod
-    def draw_sprites_fast(chip8: Chip8, x: int, y: int, n: int) -> bool:
-        """'Ultra-fast' sprite drawing using NumPy vectorized operations
-
-        PERFORMANCE ANALYSIS:
-        - Uses NumPy for vectorized bit operations and array manipulations
-        - Eliminates Python loops entirely for bit extraction
-        - Vectorized XOR and collision detection
-        - Memory-efficient with pre-allocated arrays
-        - Estimated: ~O(n) with very low constant factor, 10-50x faster than Python loops
-        """
-        import numpy as np
-
-        set_last_v = False
-
-        # Convert lists to numpy arrays for vectorized operations
-        gfx_array = np.array(chip8.gfx, dtype=np.uint32)
-        memory_array = np.array(chip8.memory, dtype=np.uint8)
-
-        # Process all sprite bytes at once
-        sprite_bytes = memory_array[chip8.i:chip8.i + n]
-
-        for byte_index in range(len(sprite_bytes)):
-            current_y = y + byte_index
-            if current_y >= 32:
-                break
-
-            # Extract all 8 bits from the sprite byte using vectorized operations
-            sprite_byte = int(sprite_bytes[byte_index])  # Ensure it's a Python int
-
-            # Create bit mask for all 8 pixels in this row
-            bit_positions = np.arange(8, dtype=np.int32)  # Use int32 to avoid overflow
-            pixel_bits = (sprite_byte >> (7 - bit_positions)) & 1
-
-            # Calculate screen positions for this row
-            pixel_x_positions = x + bit_positions
-
-            # Only process pixels that are within bounds
-            valid_pixels = (pixel_x_positions < 64) & (pixel_bits == 1)
-
-            if not np.any(valid_pixels):
-                continue
-
-            # Get the valid positions
-            valid_x = pixel_x_positions[valid_pixels]
-            row_offset = current_y * 64
-            pixel_indices = row_offset + valid_x
-
-            # Vectorized collision detection
-            existing_pixels = gfx_array[pixel_indices]
-            collision_mask = existing_pixels > 0
-            set_last_v |= np.any(collision_mask)
-
-            # Vectorized XOR operation (toggle pixels)
-            gfx_array[pixel_indices] ^= 0xffffffff
-
-        # Update the original list (convert back from numpy)
-        # Ensure we convert to Python ints to avoid numpy scalar issues
-        for i in range(len(chip8.gfx)):
-            chip8.gfx[i] = int(gfx_array[i])
+                pixel_bit = 1 << (63 - ((x + col) & 63))
+                set_last_v |= (gfx[current_y] & pixel_bit) != 0
+                gfx[current_y] ^= pixel_bit
 
         return set_last_v
 
@@ -8,7 +8,7 @@ import sdl2
 from chip8 import Chip8
 from common import StateError
 from cpu import Cpu
-from sdl_wrapper import SdlContext, map_sdl_key_to_chip8
+from sdl_wrapper import SdlContext, map_sdl_scancode_to_chip8, read_keypad_state
 
 
 def load_rom(file_path: str) -> List[int]:
@@ -100,6 +100,7 @@ def main():
     # Timing variables for 60Hz operation
     target_fps = 60
     frame_time = 1.0 / target_fps
+    cycles_per_frame = 16  # ~1000 instructions per second
     last_time = time.time()
 
     # Main emulation loop
@@ -117,32 +118,19 @@ def main():
                     running = False
 
                 elif event.type == sdl2.SDL_KEYDOWN:
-                    chip8_key = map_sdl_key_to_chip8(event.key.keysym.sym)
-                    if chip8_key is not None:
-                        # Set key as pressed in keyboard state
-                        chip8.keyboard |= (1 << chip8_key)
-
-                        # Handle waiting for key press
-                        if chip8.waiting_for_key_press:
+                    # Handle waiting for key press
+                    if chip8.waiting_for_key_press:
+                        chip8_key = map_sdl_scancode_to_chip8(event.key.keysym.scancode)
+                        if chip8_key is not None:
                             Cpu.key_pressed(chip8, chip8_key)
 
                 elif event.type == sdl2.SDL_KEYUP:
-                    chip8_key = map_sdl_key_to_chip8(event.key.keysym.sym)
-                    if chip8_key is not None:
-                        # Clear key from keyboard state
-                        chip8.keyboard &= ~(1 << chip8_key)
-
                     # ESC key to quit
                     if event.key.keysym.sym == sdl2.SDLK_ESCAPE:
                         running = False
 
-            # Execute CPU step if not waiting for key press
-            if not chip8.waiting_for_key_press:
-                try:
-                    Cpu.step(chip8, 60)  # 60Hz timing
-                except Exception as e:
-                    print(f"CPU step error: {e}")
-                    # Continue execution for now, could add error handling here
+            # Update the whole keypad at once from SDL's keyboard state (refreshed by the polling above)
+            chip8.keyboard = read_keypad_state()
 
             # Handle audio based on sound timer
             if chip8.sound_timer > 0:
@@ -150,13 +138,22 @@ def main():
             else:
                 sdl_context.stop_beep()
 
-            # Render at 60Hz
+            # Run a frame's worth of instructions, update timers and render at 60Hz
             if current_time - last_time >= frame_time:
+                try:
+                    Cpu.run_cycles(chip8, cycles_per_frame)
+                except Exception as e:
+                    print(f"CPU step error: {e}")
+                    # Continue execution for now, could add error handling here
+
+                Cpu.tick_timers(chip8)
+
+                # Presenting blocks on vsync, which paces the loop
                 sdl_context.render_display(chip8.gfx)
                 last_time = current_time
-
-            # Small delay to prevent 100% CPU usage
-            time.sleep(0.001)
+            else:
+                # Frame not due yet (vsync off or faster than 60Hz), yield briefly
+                sdl2.SDL_Delay(1)
 
     except KeyboardInterrupt:
         print("\nEmulator interrupted by user")
@@ -1,24 +1,85 @@
 ﻿from dataclasses import dataclass
 from typing import Optional
 import ctypes
+import sys
 
 import sdl2
 import sdl2.ext
 import sdl2.sdlmixer
 import numpy as np
 
-from common import StateError
+from common import NUMBA_AVAILABLE, StateError, njit
 
+try:
+    from _gfx import expand as _expand_pixels_compiled
+except ImportError:  # _gfx is optional, built by setup.py
+    _expand_pixels_compiled = None
 
-def map_sdl_key_to_chip8(sdl_key) -> Optional[int]:
-    """Map SDL key codes to CHIP-8 hex keypad (0-F)"""
-    key_map = {
-        sdl2.SDLK_1: 0x1, sdl2.SDLK_2: 0x2, sdl2.SDLK_3: 0x3, sdl2.SDLK_4: 0xC,
-        sdl2.SDLK_q: 0x4, sdl2.SDLK_w: 0x5, sdl2.SDLK_e: 0x6, sdl2.SDLK_r: 0xD,
-        sdl2.SDLK_a: 0x7, sdl2.SDLK_s: 0x8, sdl2.SDLK_d: 0x9, sdl2.SDLK_f: 0xE,
-        sdl2.SDLK_z: 0xA, sdl2.SDLK_x: 0x0, sdl2.SDLK_c: 0xB, sdl2.SDLK_v: 0xF
-    }
-    return key_map.get(sdl_key)
+
+# CHIP-8 hex keypad (index 0-F) to SDL scancode, so keys are read by physical position:
+#   1 2 3 C      1 2 3 4
+#   4 5 6 D  ->  Q W E R
+#   7 8 9 E      A S D F
+#   A 0 B F      Z X C V
+_KEYPAD_SCANCODES = np.array([
+    sdl2.SDL_SCANCODE_X, sdl2.SDL_SCANCODE_1, sdl2.SDL_SCANCODE_2, sdl2.SDL_SCANCODE_3,
+    sdl2.SDL_SCANCODE_Q, sdl2.SDL_SCANCODE_W, sdl2.SDL_SCANCODE_E, sdl2.SDL_SCANCODE_A,
+    sdl2.SDL_SCANCODE_S, sdl2.SDL_SCANCODE_D, sdl2.SDL_SCANCODE_Z, sdl2.SDL_SCANCODE_C,
+    sdl2.SDL_SCANCODE_4, sdl2.SDL_SCANCODE_R, sdl2.SDL_SCANCODE_F, sdl2.SDL_SCANCODE_V
+], dtype=np.intp)
+_KEYPAD_BITS = np.left_shift(np.uint32(1), np.arange(16, dtype=np.uint32))
+
+
+def _build_scancode_lut() -> bytearray:
+    """Build the SDL scancode to CHIP-8 hex keypad (0-F) lookup table, 0xFF marks unmapped keys"""
+    lut = bytearray(b'\xff' * sdl2.SDL_NUM_SCANCODES)
+    for chip8_key, scancode in enumerate(_KEYPAD_SCANCODES):
+        lut[scancode] = chip8_key
+    return lut
+
+
+_SCANCODE_LUT = _build_scancode_lut()
+
+
+@njit(cache=True)
+def _expand_pixels(gfx: np.ndarray, out: np.ndarray) -> None:
+    """Unpack one uint64 per row (MSB = leftmost pixel) straight into RGBA8888 pixels in out"""
+    width = out.shape[1]
+    for row in range(gfx.shape[0]):
+        bits = gfx[row]
+        for col in range(width):
+            if (bits >> np.uint64(width - 1 - col)) & np.uint64(1):
+                out[row, col] = 0xFFFFFFFF
+            else:
+                out[row, col] = 0x000000FF
+
+
+@njit(cache=True)
+def _fill_wave(table: np.ndarray, pos: int, out: np.ndarray) -> int:
+    """Fill out by repeating the wave table from pos and return the position to continue from"""
+    period = table.size
+    for k in range(out.size):
+        out[k] = table[pos]
+        pos += 1
+        if pos == period:
+            pos = 0
+    return pos
+
+
+def map_sdl_scancode_to_chip8(scancode) -> Optional[int]:
+    """Map SDL scancodes to CHIP-8 hex keypad (0-F), matching read_keypad_state"""
+    if not 0 <= scancode < len(_SCANCODE_LUT):
+        return None
+    chip8_key = _SCANCODE_LUT[scancode]
+    return None if chip8_key == 0xFF else chip8_key
+
+
+def read_keypad_state() -> int:
+    """Read the whole CHIP-8 keypad from SDL's keyboard state as a 16-bit mask (bit n = key n)"""
+    num_keys = ctypes.c_int()
+    state = sdl2.SDL_GetKeyboardState(ctypes.byref(num_keys))
+    keys = np.ctypeslib.as_array(state, shape=(num_keys.value,))
+    return int(np.dot(keys[_KEYPAD_SCANCODES], _KEYPAD_BITS))
 
 
 class AudioGenerator:
@@ -28,19 +89,28 @@ class AudioGenerator:
         self.sample_rate = sample_rate
         self.frequency = frequency
         self.amplitude = amplitude
-        self.phase = 0.0
-        self.phase_increment = 2.0 * np.pi * frequency / sample_rate
-
-    def generate_square_wave(self, num_samples):
-        """Generate square wave audio samples"""
-        samples = []
-        for _ in range(num_samples):
-            # Generate square wave
-            sample = self.amplitude if np.sin(self.phase) >= 0 else -self.amplitude
-            samples.append(int(sample * 32767))  # Convert to 16-bit signed integer
-            self.phase += self.phase_increment
-            if self.phase >= 2.0 * np.pi:
-                self.phase -= 2.0 * np.pi
+        self.amplitude_i16 = int(amplitude * 32767)  # 16-bit signed sample value
+
+        # One full period of the wave (positive half, then negative half), tiled to any length
+        period = max(2, round(sample_rate / frequency))
+        self.table = np.empty(period, dtype=np.int16)
+        self.table[:period // 2] = self.amplitude_i16
+        self.table[period // 2:] = -self.amplitude_i16
+        self.table_pos = 0
+
+    def generate_square_wave(self, num_samples, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Generate square wave audio samples as 16-bit signed integers, into `out` if given"""
+        if out is None:
+            out = np.empty(num_samples, dtype=np.int16)
+        samples = out[:num_samples]
+
+        if NUMBA_AVAILABLE:
+            self.table_pos = _fill_wave(self.table, self.table_pos, samples)
+            return samples
+
+        # Rotate the table to the current position and repeat it, continuing where the last call stopped
+        samples[:] = np.resize(np.roll(self.table, -self.table_pos), num_samples)
+        self.table_pos = (self.table_pos + num_samples) % len(self.table)
         return samples
 
 
@@ -59,9 +129,15 @@ class SdlContext:
     error_state: StateError = StateError.NONE
     audio_generator: Optional[AudioGenerator] = None
     beep_playing: bool = False
+    vsync: bool = True  # False lets the host loop alone pace presentation
 
     def __post_init__(self):
         """Initialize SDL after dataclass creation"""
+        # Buffers reused for every frame to spread the packed rows into one byte per pixel
+        self._bit_masks = np.array([0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01], dtype=np.uint8)
+        self._pixel_bits = np.empty((self.chip8_height, self.chip8_width // 8, 8), dtype=np.uint8)
+        self._pixel_mask = np.empty((self.chip8_height, self.chip8_width), dtype=bool)
+        self._last_gfx: Optional[bytes] = None  # Frame currently in the texture
         self.init_sdl()
 
     def audio_callback(self, userdata, stream, length):
@@ -75,9 +151,8 @@ class SdlContext:
         num_samples = length // 2  # 16-bit samples
         samples = self.audio_generator.generate_square_wave(num_samples)
 
-        # Convert to ctypes array and copy to stream
-        sample_array = (ctypes.c_int16 * num_samples)(*samples)
-        ctypes.memmove(stream, sample_array, length)
+        # Copy straight from the sample buffer to the stream
+        ctypes.memmove(stream, samples.ctypes.data, length)
 
     def init_sdl(self) -> StateError:
         """Initialize SDL components including audio"""
@@ -101,11 +176,10 @@ class SdlContext:
             return self.error_state
 
         # Create renderer
-        self.renderer = sdl2.SDL_CreateRenderer(
-            self.window,
-            -1,
-            sdl2.SDL_RENDERER_ACCELERATED | sdl2.SDL_RENDERER_PRESENTVSYNC
-        )
+        renderer_flags = sdl2.SDL_RENDERER_ACCELERATED
+        if self.vsync:
+            renderer_flags |= sdl2.SDL_RENDERER_PRESENTVSYNC
+        self.renderer = sdl2.SDL_CreateRenderer(self.window, -1, renderer_flags)
 
         if not self.renderer:
             self.error_state |= StateError.RENDERER_CREATE
@@ -166,6 +240,10 @@ class SdlContext:
                 return False
 
             self.audio_spec = obtained_spec
+
+            # One beep burst (1/10 second), refilled in place every time the beep starts
+            self._burst_buf = (ctypes.c_int16 * (obtained_spec.freq // 10))()
+            self._burst_np = np.frombuffer(self._burst_buf, dtype=np.int16)
             print(f"Audio initialized: {obtained_spec.freq}Hz, {obtained_spec.channels} channel(s)")
             return True
 
@@ -193,16 +271,9 @@ class SdlContext:
         if not self.audio_device or not self.audio_generator:
             return
 
-        # Generate 1/10 second of audio (short beep bursts)
-        samples_per_burst = self.audio_spec.freq // 10
-        samples = self.audio_generator.generate_square_wave(samples_per_burst)
-
-        # Convert to bytes
-        sample_array = (ctypes.c_int16 * len(samples))(*samples)
-        audio_data = ctypes.string_at(sample_array, len(samples) * 2)
-
-        # Queue the audio
-        sdl2.SDL_QueueAudio(self.audio_device, audio_data, len(audio_data))
+        # Refill the pooled 1/10 second burst (short beep bursts) and queue it
+        self.audio_generator.generate_square_wave(len(self._burst_np), out=self._burst_np)
+        sdl2.SDL_QueueAudio(self.audio_device, self._burst_buf, ctypes.sizeof(self._burst_buf))
 
     def cleanup(self):
         """Clean up SDL resources"""
@@ -222,42 +293,75 @@ class SdlContext:
             sdl2.SDL_SetRenderDrawColor(self.renderer, 0, 0, 0, 0)
             sdl2.SDL_RenderClear(self.renderer)
 
-    @staticmethod
-    def gfx_to_pixels(gfx_buffer):
-        """Convert CHIP-8 graphics buffer to RGBA pixel data"""
-        # Convert to numpy array
-        arr = np.array(gfx_buffer, dtype=np.uint32)
-
-        # Create RGBA pixels: white (255,255,255,255) for non-zero, black (0,0,0,255) for zero
-        # We need 4 bytes per pixel (RGBA)
-        pixels = np.zeros((len(gfx_buffer), 4), dtype=np.uint8)
-
-        # Set RGB channels to 255 for non-zero pixels, alpha always 255
-        mask = arr != 0
-        pixels[mask] = [255, 255, 255, 255]  # White pixels
-        pixels[~mask] = [0, 0, 0, 0]         # Black pixels (alpha=255 for proper rendering)
+    def fill_pixels(self, gfx_buffer, out: np.ndarray) -> np.ndarray:
+        """Convert CHIP-8 graphics buffer (one uint64 per row, MSB = leftmost pixel) to RGBA pixel data
+
+        `gfx_buffer` is the uint64 row array from Chip8 or any contiguous buffer holding the
+        raw bytes of those rows (an ndarray of any dtype, bytes, bytearray, memoryview); its
+        memory is reinterpreted as uint64 rows in place, never converted or copied, and must
+        hold exactly chip8_height rows, otherwise ValueError is raised.
+        Writes into `out`, a (height, width) uint32 array such as the locked texture memory,
+        so no arrays are allocated per frame.
+        """
+        if isinstance(gfx_buffer, np.ndarray) and gfx_buffer.flags.c_contiguous:
+            gfx_buffer = gfx_buffer.reshape(-1).view(np.uint64)
+        else:
+            gfx_buffer = np.frombuffer(gfx_buffer, dtype=np.uint64)
+        if gfx_buffer.shape[0] != self.chip8_height:
+            raise ValueError(f"gfx_buffer must hold {self.chip8_height} uint64 rows, got {gfx_buffer.shape[0]}")
+
+        if _expand_pixels_compiled is not None and self.chip8_width == 64:
+            _expand_pixels_compiled(gfx_buffer, out)
+            return out
+
+        if NUMBA_AVAILABLE:
+            _expand_pixels(gfx_buffer, out)
+            return out
+
+        # View each row as its 8 bytes, leftmost pixels first (a view, not a copy)
+        row_bytes = gfx_buffer.view(np.uint8).reshape(self.chip8_height, self.chip8_width // 8)
+        if sys.byteorder == 'little':
+            row_bytes = row_bytes[:, ::-1]
+
+        # Branchless byte-wide AND + compare gives one mask value per pixel
+        np.bitwise_and(row_bytes[:, :, None], self._bit_masks, out=self._pixel_bits)
+        np.not_equal(self._pixel_bits.reshape(self._pixel_mask.shape), 0, out=self._pixel_mask)
+
+        # RGBA8888 as one uint32 per pixel: mask scaled into the RGB bytes, alpha always opaque,
+        # giving white (0xFFFFFFFF) or black (0x000000FF)
+        np.multiply(self._pixel_mask, np.uint32(0xFFFFFF00), out=out)
+        np.bitwise_or(out, np.uint32(0x000000FF), out=out)
+        return out
+
+    def update_texture(self, gfx_buffer) -> bool:
+        """Write the CHIP-8 display buffer into the streaming texture, returns False if it could not be locked"""
+        # Lock the streaming texture and write the RGBA pixels straight into its memory
+        pixels = ctypes.c_void_p()
+        pitch = ctypes.c_int()
+        if sdl2.SDL_LockTexture(self.texture, None, ctypes.byref(pixels), ctypes.byref(pitch)) != 0:
+            return False
 
-        return pixels.flatten().tobytes()
+        try:
+            # Rows may be padded, so view the memory as pitch-wide rows and use the visible part
+            row_length = pitch.value // 4  # 4 bytes per pixel (RGBA)
+            texture_memory = (ctypes.c_uint32 * (row_length * self.chip8_height)).from_address(pixels.value)
+            texture_pixels = np.ctypeslib.as_array(texture_memory).reshape(self.chip8_height, row_length)
+            self.fill_pixels(gfx_buffer, texture_pixels[:, :self.chip8_width])
+        finally:
+            sdl2.SDL_UnlockTexture(self.texture)
+        return True
 
     def render_display(self, gfx_buffer):
         """Render the CHIP-8 display buffer to screen"""
         if not self.renderer or not self.texture:
             return
 
-        # Update texture with pixel data
-        pitch = self.chip8_width * 4  # 4 bytes per pixel (RGBA)
-
-        # Convert CHIP-8 graphics buffer to RGBA pixels
-        pixel_data = self.gfx_to_pixels(gfx_buffer)
-
-        sdl2.SDL_UpdateTexture(
-            self.texture,
-            None,
-            pixel_data,
-            pitch
-        )
+        # Only touch the texture when the display changed (exact compare of the 256 byte frame).
+        # If the texture cannot be locked, keep presenting (vsync paces the loop) and retry next frame
+        gfx_bytes = bytes(gfx_buffer)
+        if gfx_bytes != self._last_gfx and self.update_texture(gfx_buffer):
+            self._last_gfx = gfx_bytes
 
-        # Clear and render
-        self.clear_screen()
+        # The texture is stretched over the whole window, so no clear is needed before copying it
         sdl2.SDL_RenderCopy(self.renderer, self.texture, None, None)
         sdl2.SDL_RenderPresent(self.renderer)
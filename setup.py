@@ -0,0 +1,32 @@
+"""Optional Cython build of the CHIP-8 core.
+
+The emulator runs as plain Python; building the extensions in place
+compiles ``cpu.py`` to C so the interpreter loop runs without bytecode
+dispatch, and ``_gfx.pyx`` into the display's pixel expansion kernel:
+
+    python setup.py build_ext --inplace
+"""
+import sys
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+extra_compile_args = [] if sys.platform == "win32" else ["-O3", "-march=native"]
+
+extensions = [
+    Extension("cpu", ["cpu.py"], extra_compile_args=extra_compile_args),
+    Extension("_gfx", ["_gfx.pyx"], extra_compile_args=extra_compile_args),
+]
+
+setup(
+    name="chip8py",
+    ext_modules=cythonize(
+        extensions,
+        compiler_directives={
+            "language_level": 3,
+            "boundscheck": False,
+            "wraparound": False,
+            "cdivision": True,
+        },
+    ),
+)
@@ -0,0 +1,34 @@
+﻿import numpy as np
+
+from common import njit
+
+
+@njit(cache=True, boundscheck=False)
+def draw_sprite(gfx: np.ndarray, memory: np.ndarray, i: int, x: int, y: int, n: int) -> bool:
+    """Draw an n-byte sprite from memory[i] at (x, y) and return True if collision detected
+
+    gfx holds one uint64 per screen row with the leftmost pixel in the most
+    significant bit, so each sprite row is drawn as a single shifted mask.
+    Sprites wrap around the screen edges (AND masks, 64 and 32 are powers of two).
+    """
+    collision = False
+    x &= 63
+    y &= 31
+
+    # Pixels shifted past the right edge come back in at the left
+    shift_right = np.uint64(x)
+    shift_left = np.uint64((64 - x) & 63)
+
+    for row in range(n):
+        # Sprite byte moved to the top of the row, then rotated right by x
+        sprite_row = np.uint64(memory[(i + row) & 0xFFF]) << np.uint64(56)
+        mask = sprite_row >> shift_right
+        if x != 0:
+            mask |= sprite_row << shift_left
+
+        current_y = (y + row) & 31
+        if gfx[current_y] & mask:
+            collision = True
+        gfx[current_y] ^= mask
+
+    return collision